@@ -18,19 +18,64 @@ Commands:
 
 Options:
     --file, -f  - Specify the questions JSON file (default: nat_hist_bee_questions.json)
+    --compact   - Write the questions file without indentation
 
 If no command is provided, runs in interactive mode.
 """
 
 import argparse
+import hashlib
 import json
+import os
 import re
 import sys
 from collections import defaultdict
 
+try:
+    import orjson  # Optional: much faster JSON parsing and encoding
+except ImportError:
+    orjson = None
+
 # File to operate on (must be specified via command line or interactive mode)
 QUESTIONS_FILE = None
 
+# Write JSON without indentation (--compact)
+COMPACT_JSON = False
+
+# Difficulty buckets, in file order
+DIFFICULTY_LEVELS = ['preliminary', 'quarterfinals', 'semifinals', 'finals']
+
+def load_json(path):
+    """Load a JSON file (with orjson when it is installed)."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_json(path, data):
+    """Write data as JSON (with orjson when it is installed).
+
+    Indented unless COMPACT_JSON is set; orjson's output is byte-for-byte
+    what json.dump produces with the same layout and ensure_ascii=False.
+    The file is written to a temporary name and renamed over the original,
+    so an interrupted write never leaves a truncated file behind.
+    """
+    tmp_path = path + '.tmp'
+    if orjson is not None:
+        option = 0 if COMPACT_JSON else orjson.OPT_INDENT_2
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=option))
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        layout = {'separators': (',', ':')} if COMPACT_JSON else {'indent': 2}
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, **layout)
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
 # =============================================================================
 # ANSWER CLEANING
 # =============================================================================
@@ -61,11 +106,23 @@ ANSWER_CLEANUP_PATTERNS = [
     r'\s*US History Bee.*Phase \d+.*$',
 ]
 
+ANSWER_CLEANUP_RES = [re.compile(p, re.IGNORECASE) for p in ANSWER_CLEANUP_PATTERNS]
+
+# All cleanup patterns as one alternation, used to skip answers that none of
+# them match (most answers). The leading \s* is dropped since it can only
+# widen a match, not decide whether there is one.
+ANSWER_CLEANUP_RE = re.compile(
+    '|'.join('(?:' + p.removeprefix(r'\s*') + ')' for p in ANSWER_CLEANUP_PATTERNS),
+    re.IGNORECASE
+)
+
 def clean_answer(answer):
     """Remove unwanted suffixes from answer strings."""
+    if not ANSWER_CLEANUP_RE.search(answer):
+        return answer.strip()
     cleaned = answer
-    for pattern in ANSWER_CLEANUP_PATTERNS:
-        cleaned = re.sub(pattern, '', cleaned, flags=re.IGNORECASE)
+    for pattern_re in ANSWER_CLEANUP_RES:
+        cleaned = pattern_re.sub('', cleaned)
     return cleaned.strip()
 
 def clean_answers():
@@ -76,8 +133,7 @@ def clean_answers():
 
     # Load questions
     print(f"\nLoading {QUESTIONS_FILE}...")
-    with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json(QUESTIONS_FILE)
 
     changes = 0
 
@@ -95,8 +151,7 @@ def clean_answers():
 
     if changes > 0:
         # Save the cleaned data
-        with open(QUESTIONS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json(QUESTIONS_FILE, data)
         print(f"\nCleaned {changes} answers.")
         print(f"File saved!")
     else:
@@ -109,14 +164,28 @@ def clean_answers():
 # DUPLICATE HANDLING
 # =============================================================================
 
+# HTML tags (e.g. <strong>, <em>) stripped before comparing questions
+TAG_RE = re.compile(r'<[^>]+>')
+
 def normalize_question(question_text):
     """Normalize question text for comparison by removing HTML tags and extra whitespace."""
-    # Remove HTML tags
-    text = re.sub(r'<[^>]+>', '', question_text)
+    # Remove HTML tags (about half the questions have none to remove)
+    text = question_text
+    if '<' in text:
+        text = TAG_RE.sub('', text)
     # Convert to lowercase and normalize whitespace
     text = ' '.join(text.lower().split())
     return text
 
+def question_key(question_text):
+    """Return a compact duplicate-detection key for a question.
+
+    The key is a 16-byte BLAKE2b digest of the normalized text, so the
+    tracking sets hold digests rather than full normalized strings.
+    """
+    text = normalize_question(question_text)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
 def check_duplicates(verbose=True):
     """Find duplicate questions in the database. Returns dict of duplicates."""
     if verbose:
@@ -125,43 +194,56 @@ def check_duplicates(verbose=True):
         print("=" * 70)
 
     # Load questions
-    with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    # Track questions by normalized text
-    question_tracker = defaultdict(list)
-    difficulty_levels = ['preliminary', 'quarterfinals', 'semifinals', 'finals']
+    data = load_json(QUESTIONS_FILE)
+    sections = [
+        (difficulty, data[difficulty])
+        for difficulty in DIFFICULTY_LEVELS
+        if difficulty in data
+    ]
+
+    # First pass: find which question keys occur more than once, without
+    # building a record for every (mostly unique) question
+    seen_once = set()
+    seen_again = set()
     total_questions = 0
 
-    # Scan all questions
-    for difficulty in difficulty_levels:
-        if difficulty not in data:
-            continue
-
-        questions = data[difficulty]
+    for difficulty, questions in sections:
         if verbose:
             print(f"\nScanning {difficulty}: {len(questions)} questions...")
 
-        for idx, q in enumerate(questions):
+        for q in questions:
             if not isinstance(q, dict):
                 continue
             total_questions += 1
-            normalized = normalize_question(q.get('question', ''))
-            question_tracker[normalized].append({
-                'difficulty': difficulty,
-                'index': idx,
-                'id': q.get('id', 'unknown'),
-                'original': q.get('question', ''),
-                'answer': q.get('answer', '')
-            })
-
-    # Find duplicates
-    duplicates = {k: v for k, v in question_tracker.items() if len(v) > 1}
+            key = question_key(q.get('question', ''))
+            if key in seen_once:
+                seen_again.add(key)
+            else:
+                seen_once.add(key)
+
+    # Second pass: collect occurrence details for the duplicated texts only,
+    # grouped by their normalized text
+    duplicates = defaultdict(list)
+    if seen_again:
+        for difficulty, questions in sections:
+            for idx, q in enumerate(questions):
+                if not isinstance(q, dict):
+                    continue
+                if question_key(q.get('question', '')) in seen_again:
+                    normalized = normalize_question(q.get('question', ''))
+                    duplicates[normalized].append({
+                        'difficulty': difficulty,
+                        'index': idx,
+                        'id': q.get('id', 'unknown'),
+                        'original': q.get('question', ''),
+                        'answer': q.get('answer', '')
+                    })
+    duplicates = dict(duplicates)
 
     if verbose:
         print(f"\n{'='*70}")
         print(f"Total questions scanned: {total_questions:,}")
-        print(f"Unique questions: {len(question_tracker):,}")
+        print(f"Unique questions: {len(seen_once):,}")
         print(f"Duplicate sets found: {len(duplicates):,}")
         print(f"{'='*70}")
 
@@ -189,12 +271,10 @@ def remove_duplicates():
 
     # Load questions
     print(f"\nLoading {QUESTIONS_FILE}...")
-    with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json(QUESTIONS_FILE)
 
-    # Track questions we've seen
+    # Track questions we've seen, by question_key digest
     seen_questions = set()
-    difficulty_levels = ['preliminary', 'quarterfinals', 'semifinals', 'finals']
 
     # Statistics
     original_counts = {}
@@ -202,7 +282,7 @@ def remove_duplicates():
     removed_counts = {}
 
     # Process each difficulty level
-    for difficulty in difficulty_levels:
+    for difficulty in DIFFICULTY_LEVELS:
         if difficulty not in data:
             continue
 
@@ -219,10 +299,10 @@ def remove_duplicates():
         for q in questions:
             if not isinstance(q, dict):
                 continue
-            normalized = normalize_question(q.get('question', ''))
+            key = question_key(q.get('question', ''))
 
-            if normalized not in seen_questions:
-                seen_questions.add(normalized)
+            if key not in seen_questions:
+                seen_questions.add(key)
                 deduplicated_questions.append(q)
             else:
                 removed += 1
@@ -236,12 +316,10 @@ def remove_duplicates():
     # Update metadata
     if 'metadata' in data:
         data['metadata'] = {
-            'total_preliminary': deduplicated_counts.get('preliminary', 0),
-            'total_quarterfinals': deduplicated_counts.get('quarterfinals', 0),
-            'total_semifinals': deduplicated_counts.get('semifinals', 0),
-            'total_finals': deduplicated_counts.get('finals', 0),
-            'total': sum(deduplicated_counts.values())
+            f'total_{difficulty}': deduplicated_counts.get(difficulty, 0)
+            for difficulty in DIFFICULTY_LEVELS
         }
+        data['metadata']['total'] = sum(deduplicated_counts.values())
 
     # Calculate totals
     total_removed = sum(removed_counts.values())
@@ -249,8 +327,7 @@ def remove_duplicates():
     if total_removed > 0:
         # Save deduplicated data
         print(f"\nSaving to {QUESTIONS_FILE}...")
-        with open(QUESTIONS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json(QUESTIONS_FILE, data)
 
         print(f"\nRemoved {total_removed} duplicate questions.")
         print("File saved!")
@@ -365,15 +442,18 @@ Examples:
                         help='Command to run')
     parser.add_argument('--file', '-f', default=None,
                         help='Questions JSON file (required for non-interactive mode)')
+    parser.add_argument('--compact', action='store_true',
+                        help='Write the questions file without indentation')
     return parser.parse_args()
 
 
 def main():
     """Main entry point."""
-    global QUESTIONS_FILE
+    global QUESTIONS_FILE, COMPACT_JSON
 
     args = parse_args()
     QUESTIONS_FILE = args.file
+    COMPACT_JSON = args.compact
 
     if args.command:
         if not QUESTIONS_FILE:
@@ -3,6 +3,14 @@
 Simple server for the Question Database Editor.
 Handles saving changes to questions and metadata JSON files.
 
+Both files are loaded once at startup and edited in memory. Each save is
+appended to an edit log (<questions file>.edits.ndjson) and the JSON files
+are rewritten a few seconds later, once per batch of edits. Edits still in
+the log when the server stops are replayed on the next start. If another
+script rewrites either file while the server runs, it is reloaded and the
+logged edits are replayed on top before anything is written. The previous
+version of each file is kept in backup/ (the last 10 per file).
+
 Usage:
     python3 editor_server.py [--questions FILE] [--metadata FILE] [--port PORT]
 
@@ -13,18 +21,417 @@ Options:
 """
 
 import argparse
+import glob
 import http.server
-import socketserver
 import json
 import os
+import shutil
+import threading
 from urllib.parse import urlparse
 from datetime import datetime
 
+try:
+    import orjson  # Optional: much faster JSON parsing and encoding
+except ImportError:
+    orjson = None
+
 # Configuration (must be specified via command line)
 DEFAULT_PORT = 8765
 PORT = DEFAULT_PORT
 QUESTIONS_FILE = None
 METADATA_FILE = None
+EDITS_FILE = None
+
+# Seconds to wait after a save before writing the JSON files, so a burst of
+# edits costs one rewrite instead of one per edit
+COMPACT_DELAY = 5.0
+
+# Backups of the previous file versions (relative to the project root)
+BACKUP_DIR = 'backup'
+BACKUPS_KEPT = 10
+
+# Loaded questions and metadata, shared by the request threads and the
+# compaction timer; every access holds _state_lock. _flush_lock keeps one
+# compaction at a time and is always taken before _state_lock.
+_questions = None
+_metadata = None
+# Position of each question in its category: {category: {id: index}}
+_id_index = None
+_state_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_edits_log = None
+_pending_edits = 0
+# Whether pending edits touched the questions file (every edit touches metadata)
+_questions_dirty = False
+_compact_timer = None
+# (st_mtime_ns, st_size) of each JSON file as last loaded or written, to
+# notice when another program changes it; guarded by _flush_lock
+_file_stamps = {}
+
+
+def parse_json(raw):
+    """Parse JSON from bytes (with orjson when it is installed)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode('utf-8'))
+
+
+def load_json(path):
+    """Load a JSON file (with orjson when it is installed)."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def encode_json(data):
+    """Encode data as indented JSON bytes (with orjson when it is installed).
+
+    orjson's OPT_INDENT_2 output is byte-for-byte what json.dump produces
+    with indent=2 and ensure_ascii=False.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def write_file(path, raw):
+    """Write bytes to a file through a temporary name.
+
+    The temporary file is renamed over the original, so a crash mid-write
+    never leaves a truncated file behind.
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def file_stamp(path):
+    """Return (st_mtime_ns, st_size) for a file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def index_category(category_questions):
+    """Map each question id in a category to its position.
+
+    The first occurrence wins, matching a front-to-back scan.
+    """
+    positions = {}
+    for i, q in enumerate(category_questions):
+        positions.setdefault(q['id'], i)
+    return positions
+
+
+def build_id_index(questions):
+    """Index every question category by id."""
+    return {category: index_category(qs)
+            for category, qs in questions.items() if isinstance(qs, list)}
+
+
+def backup_file(path):
+    """Keep the current version of a file in BACKUP_DIR before it is rewritten.
+
+    write_file replaces files rather than overwriting them, so a hard link
+    keeps the old contents without copying any bytes. Only the newest
+    BACKUPS_KEPT backups of each file are kept.
+    """
+    if not os.path.exists(path):
+        return
+    os.makedirs(BACKUP_DIR, exist_ok=True)
+    stem, ext = os.path.splitext(os.path.basename(path))
+    backup_time = datetime.now().strftime('%Y%m%d_%H%M%S')
+    backup_path = os.path.join(BACKUP_DIR, f'{stem}.{backup_time}{ext}')
+    if not os.path.exists(backup_path):
+        try:
+            os.link(path, backup_path)
+        except OSError:
+            # No hard links here (or across devices); copy instead
+            shutil.copyfile(path, backup_path)
+
+    backups = sorted(glob.glob(os.path.join(BACKUP_DIR, f'{glob.escape(stem)}.????????_??????{ext}')))
+    for old in backups[:-BACKUPS_KEPT]:
+        os.remove(old)
+
+
+def edit_changes(questions, metadata, index, edit):
+    """Check what an edit would change.
+
+    Returns (questions_changed, metadata_changed), or None if the original
+    question could not be found.
+    """
+    original_id = edit['original_id']
+    original_category = edit['original_category']
+    i = index.get(original_category, {}).get(original_id)
+    if i is None:
+        return None
+
+    q = questions[original_category][i]
+    questions_changed = (edit['new_category'] != original_category
+                         or edit['new_id'] != original_id
+                         or q.get('question') != edit['question']
+                         or q.get('answer') != edit['answer'])
+    metadata_changed = metadata.get('categories', {}).get(edit['new_id']) != edit['metadata']
+    return questions_changed, metadata_changed
+
+
+def apply_edit(questions, metadata, index, edit):
+    """Apply one saved edit to the loaded questions, metadata and id index.
+
+    Returns False if the original question could not be found.
+    """
+    original_id = edit['original_id']
+    original_category = edit['original_category']
+    new_id = edit['new_id']
+    new_category = edit['new_category']
+
+    # Find the question
+    i = index.get(original_category, {}).get(original_id)
+    if i is None:
+        return False
+
+    if original_category != new_category:
+        # Moving to different category
+        questions[original_category].pop(i)
+        index[original_category] = index_category(questions[original_category])
+
+        # Add to new category
+        new_question = {
+            'number': len(questions.get(new_category, [])) + 1,
+            'question': edit['question'],
+            'answer': edit['answer'],
+            'id': new_id
+        }
+        if new_category not in questions:
+            questions[new_category] = []
+        questions[new_category].append(new_question)
+        index.setdefault(new_category, {}).setdefault(new_id, len(questions[new_category]) - 1)
+
+        # Update metadata with new ID if changed
+        if original_id != new_id:
+            if original_id in metadata.get('categories', {}):
+                del metadata['categories'][original_id]
+    else:
+        # Update in place
+        questions[original_category][i]['question'] = edit['question']
+        questions[original_category][i]['answer'] = edit['answer']
+        if original_id != new_id:
+            questions[original_category][i]['id'] = new_id
+            index[original_category] = index_category(questions[original_category])
+            # Update metadata key
+            if original_id in metadata.get('categories', {}):
+                del metadata['categories'][original_id]
+
+    # Update metadata
+    if 'categories' not in metadata:
+        metadata['categories'] = {}
+
+    metadata['categories'][new_id] = dict(edit['metadata'])
+
+    # Update progress info
+    if '_progress' in metadata:
+        metadata['_progress']['last_updated'] = edit['ts']
+
+    return True
+
+
+def append_edit(edit):
+    """Append an edit to the edit log and fsync it."""
+    if orjson is not None:
+        line = orjson.dumps(edit) + b'\n'
+    else:
+        line = json.dumps(edit, ensure_ascii=False).encode('utf-8') + b'\n'
+    _edits_log.write(line)
+    _edits_log.flush()
+    os.fsync(_edits_log.fileno())
+
+
+def save_edit(edit):
+    """Log an edit, apply it in memory and schedule a write to disk.
+
+    Returns False if the original question could not be found.
+    """
+    global _pending_edits, _questions_dirty
+    with _state_lock:
+        changes = edit_changes(_questions, _metadata, _id_index, edit)
+        if changes is None:
+            return False
+        questions_changed, metadata_changed = changes
+        if not (questions_changed or metadata_changed):
+            # Saved without changes: nothing to log or write
+            return True
+
+        # Log first so the edit survives a crash before compaction
+        append_edit(edit)
+        apply_edit(_questions, _metadata, _id_index, edit)
+        if questions_changed:
+            _questions_dirty = True
+        _pending_edits += 1
+        schedule_compaction()
+    return True
+
+
+def drop_logged_edits(logged_size):
+    """Remove the first logged_size bytes, now written out, from the edit log.
+
+    Caller must hold _state_lock.
+    """
+    global _edits_log
+    if os.fstat(_edits_log.fileno()).st_size == logged_size:
+        _edits_log.truncate(0)
+        os.fsync(_edits_log.fileno())
+        return
+
+    # Edits were saved during the write; keep those
+    with open(EDITS_FILE, 'rb') as f:
+        f.seek(logged_size)
+        rest = f.read()
+    _edits_log.close()
+    write_file(EDITS_FILE, rest)
+    _edits_log = open(EDITS_FILE, 'ab')
+
+
+def compact_edits():
+    """Write any pending edits to the JSON files.
+
+    The files are encoded under _state_lock but written outside it, so saves
+    arriving meanwhile only wait for the encoding, not for the disk. Files
+    changed on disk since they were loaded are reloaded first, so the write
+    never reverts another script's changes.
+    """
+    global _compact_timer, _pending_edits, _questions_dirty
+    with _flush_lock:
+        with _state_lock:
+            if _compact_timer is not None:
+                _compact_timer.cancel()
+                _compact_timer = None
+            reload_changed_files()
+            if not _pending_edits:
+                return
+            count = _pending_edits
+            questions_raw = encode_json(_questions) if _questions_dirty else None
+            metadata_raw = encode_json(_metadata)
+            logged_size = os.fstat(_edits_log.fileno()).st_size
+            _pending_edits = 0
+            _questions_dirty = False
+
+        try:
+            if questions_raw is not None:
+                backup_file(QUESTIONS_FILE)
+                write_file(QUESTIONS_FILE, questions_raw)
+                _file_stamps[QUESTIONS_FILE] = file_stamp(QUESTIONS_FILE)
+            backup_file(METADATA_FILE)
+            write_file(METADATA_FILE, metadata_raw)
+            _file_stamps[METADATA_FILE] = file_stamp(METADATA_FILE)
+        except Exception:
+            # The edits are still in the log; keep them pending and retry
+            with _state_lock:
+                _pending_edits += count
+                _questions_dirty = _questions_dirty or questions_raw is not None
+                schedule_compaction()
+            raise
+
+        with _state_lock:
+            drop_logged_edits(logged_size)
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] Wrote {count} edit(s) to disk")
+
+
+def schedule_compaction():
+    """Start the compaction timer unless one is already running.
+
+    Caller must hold _state_lock.
+    """
+    global _compact_timer
+    if _compact_timer is None:
+        _compact_timer = threading.Timer(COMPACT_DELAY, compact_edits)
+        _compact_timer.daemon = True
+        _compact_timer.start()
+
+
+def replay_edits():
+    """Apply the edits in the edit log to the loaded state.
+
+    Returns the number of edits that applied; the rest are reported and
+    skipped.
+    """
+    replayed = 0
+    if not os.path.exists(EDITS_FILE):
+        return replayed
+    with open(EDITS_FILE, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                edit = parse_json(line)
+            except ValueError:
+                # Torn final line from an interrupted write
+                break
+            try:
+                applied = apply_edit(_questions, _metadata, _id_index, edit)
+            except (KeyError, TypeError, AttributeError) as e:
+                print(f"Skipping bad entry in {EDITS_FILE}: {e}")
+                continue
+            if not applied:
+                print(f"Skipping bad entry in {EDITS_FILE}: question "
+                      f"{edit['original_id']} not found in {edit['original_category']}")
+                continue
+            replayed += 1
+    return replayed
+
+
+def read_files():
+    """Load both JSON files and replay the edit log on top of them.
+
+    Returns the number of edits replayed.
+    """
+    global _questions, _metadata, _id_index
+    # Stat before reading, so a write racing the read is noticed next time
+    stamps = {path: file_stamp(path) for path in (QUESTIONS_FILE, METADATA_FILE)}
+    _questions = load_json(QUESTIONS_FILE)
+    _metadata = load_json(METADATA_FILE)
+    _id_index = build_id_index(_questions)
+    _file_stamps.update(stamps)
+    return replay_edits()
+
+
+def reload_changed_files():
+    """Reload the JSON files if another program changed them on disk.
+
+    The edit log holds every edit not yet written out, so replaying it on
+    the new contents keeps both the outside changes and the unsaved edits.
+    Caller must hold _flush_lock and _state_lock.
+    """
+    global _questions_dirty
+    changed = [path for path in (QUESTIONS_FILE, METADATA_FILE)
+               if file_stamp(path) != _file_stamps.get(path)]
+    if not changed:
+        return
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] WARNING: {', '.join(changed)} "
+          f"changed on disk; reloading and replaying {EDITS_FILE}")
+    read_files()
+    if _pending_edits:
+        _questions_dirty = True
+
+
+def load_state():
+    """Load both JSON files and replay any edits left in the edit log."""
+    global _edits_log, _pending_edits, _questions_dirty
+
+    replayed = read_files()
+    _edits_log = open(EDITS_FILE, 'ab')
+    if replayed:
+        _pending_edits = replayed
+        _questions_dirty = True
+        compact_edits()
+    return replayed
+
 
 class EditorHandler(http.server.SimpleHTTPRequestHandler):
     def end_headers(self):
@@ -38,6 +445,13 @@ class EditorHandler(http.server.SimpleHTTPRequestHandler):
         self.send_response(200)
         self.end_headers()
 
+    def send_head(self):
+        # Write pending edits first so the editor never loads stale files
+        path = os.path.abspath(self.translate_path(self.path))
+        if path in (os.path.abspath(QUESTIONS_FILE), os.path.abspath(METADATA_FILE)):
+            compact_edits()
+        return super().send_head()
+
     def do_POST(self):
         if self.path == '/save':
             self.handle_save()
@@ -49,89 +463,33 @@ class EditorHandler(http.server.SimpleHTTPRequestHandler):
             # Read request body
             content_length = int(self.headers['Content-Length'])
             post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            data = parse_json(post_data)
 
             # Extract data
             original_id = data['original_id']
             original_category = data['original_category']
             new_id = data['id']
-            new_category = data['category']
-            question_text = data['question']
-            answer_text = data['answer']
             new_metadata = data['metadata']
+            edit = {
+                'ts': datetime.now().isoformat(),
+                'original_id': original_id,
+                'original_category': original_category,
+                'new_id': new_id,
+                'new_category': data['category'],
+                'question': data['question'],
+                'answer': data['answer'],
+                'metadata': {
+                    'regions': new_metadata.get('regions', []),
+                    'time_periods': new_metadata.get('time_periods', []),
+                    'answer_type': new_metadata.get('answer_type', ''),
+                    'subject_themes': new_metadata.get('subject_themes', [])
+                }
+            }
 
-            # Load current files
-            with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
-                questions = json.load(f)
-
-            with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-                metadata = json.load(f)
-
-            # Backup before modifying
-            backup_time = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-            # Find and update the question
-            found = False
-            for i, q in enumerate(questions.get(original_category, [])):
-                if q['id'] == original_id:
-                    found = True
-
-                    if original_category != new_category:
-                        # Moving to different category
-                        questions[original_category].pop(i)
-
-                        # Add to new category
-                        new_question = {
-                            'number': len(questions.get(new_category, [])) + 1,
-                            'question': question_text,
-                            'answer': answer_text,
-                            'id': new_id
-                        }
-                        if new_category not in questions:
-                            questions[new_category] = []
-                        questions[new_category].append(new_question)
-
-                        # Update metadata with new ID if changed
-                        if original_id != new_id:
-                            if original_id in metadata.get('categories', {}):
-                                del metadata['categories'][original_id]
-                    else:
-                        # Update in place
-                        questions[original_category][i]['question'] = question_text
-                        questions[original_category][i]['answer'] = answer_text
-                        if original_id != new_id:
-                            questions[original_category][i]['id'] = new_id
-                            # Update metadata key
-                            if original_id in metadata.get('categories', {}):
-                                del metadata['categories'][original_id]
-                    break
-
-            if not found:
+            if not save_edit(edit):
                 self.send_error(404, f'Question {original_id} not found in {original_category}')
                 return
 
-            # Update metadata
-            if 'categories' not in metadata:
-                metadata['categories'] = {}
-
-            metadata['categories'][new_id] = {
-                'regions': new_metadata.get('regions', []),
-                'time_periods': new_metadata.get('time_periods', []),
-                'answer_type': new_metadata.get('answer_type', ''),
-                'subject_themes': new_metadata.get('subject_themes', [])
-            }
-
-            # Update progress info
-            if '_progress' in metadata:
-                metadata['_progress']['last_updated'] = datetime.now().isoformat()
-
-            # Save files
-            with open(QUESTIONS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(questions, f, indent=2, ensure_ascii=False)
-
-            with open(METADATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-
             print(f"[{datetime.now().strftime('%H:%M:%S')}] Saved changes to {new_id}")
 
             # Send success response
@@ -170,7 +528,7 @@ Examples:
 
 
 def main():
-    global PORT, QUESTIONS_FILE, METADATA_FILE
+    global PORT, QUESTIONS_FILE, METADATA_FILE, EDITS_FILE
 
     args = parse_args()
     PORT = args.port
@@ -182,12 +540,18 @@ def main():
     project_root = os.path.dirname(script_dir)
     os.chdir(project_root)
 
-    with socketserver.TCPServer(("", PORT), EditorHandler) as httpd:
+    EDITS_FILE = os.path.splitext(QUESTIONS_FILE)[0] + '.edits.ndjson'
+    replayed = load_state()
+
+    # Threaded, so a slow static GET does not hold up saves
+    with http.server.ThreadingHTTPServer(("", PORT), EditorHandler) as httpd:
         print(f"\n{'='*50}")
         print(f"  Question Database Editor Server")
         print(f"{'='*50}")
         print(f"\n  Questions file: {QUESTIONS_FILE}")
         print(f"  Metadata file:  {METADATA_FILE}")
+        if replayed:
+            print(f"\n  Recovered {replayed} unsaved edit(s) from {EDITS_FILE}")
         print(f"\n  Open in browser: http://localhost:{PORT}/question_editor.html")
         print(f"\n  Press Ctrl+C to stop the server")
         print(f"{'='*50}\n")
@@ -195,6 +559,7 @@ def main():
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
+            compact_edits()
             print("\nServer stopped.")
 
 
@@ -3,23 +3,79 @@
 Extract History Bee questions from PDF files and save to JSON with formatting.
 
 Usage:
-    python extract_questions.py [--input DIR] [--output FILE]
+    python extract_questions.py [--input DIR] [--output FILE] [--jobs N] [--plain] [--no-cache]
 
 Options:
     --input, -i   Directory containing PDF files (default: current directory)
     --output, -o  Output JSON file (default: questions.json in input directory)
+    --jobs, -j    Number of PDFs to process in parallel (default: CPU count, max 8)
+    --plain       Emit plain text without <strong>/<em> formatting tags
+    --no-cache    Re-parse every PDF instead of reusing cached results
+
+Questions extracted from each PDF are cached in a .extract_cache directory
+next to the PDFs, keyed by file name, size, modification time, and a hash of
+this script (so changes to the extraction code invalidate the cache).
 """
 
 import argparse
+import glob
+import hashlib
 import json
+import os
 import re
+from functools import partial
+from multiprocessing import Pool
 from pathlib import Path
 import fitz  # PyMuPDF
 
+try:
+    import orjson  # Optional: much faster JSON encoding
+except ImportError:
+    orjson = None
+
+# Header/footer lines to drop from extracted text, compiled once as a single
+# alternation. Empty lines are filtered separately in clean_text().
+SKIP_LINE_RE = re.compile(
+    r'(?:\d{4}-\d{2}.*History Bee)'  # Headers like "2021-22 A-Set History Bee"
+    r'|(?:Bee Round \d+\s*$)'  # "Bee Round 1"
+    r'|(?:Bee Finals\s*$)'  # "Bee Finals"
+    r'|(?:Page \d+)'  # Page numbers
+    r'|(?:Regulation Tossups\s*$)'  # Section headers
+    r'|(?:Extra Questions\s*$)'  # Section headers
+)
+
+# Question numbers: (1), (2), etc.
+QUESTION_NUMBER_RE = re.compile(r'\((\d+)\)')
+
+# ANSWER: label, either wrapped in formatting tags or plain. The bold label
+# wins wherever it appears; the plain one is only a fallback.
+FORMATTED_ANSWER_RE = re.compile(r'<strong>ANSWER:</strong>\s*(.+?)(?=\(\d+\)|$)', re.DOTALL)
+PLAIN_ANSWER_RE = re.compile(r'ANSWER:\s*(.+?)(?=\(\d+\)|$)', re.DOTALL)
+
+# PDFs are independent, so they are parsed in a pool of worker processes
+DEFAULT_JOBS = min(os.cpu_count() or 1, 8)
+
+# Per-PDF extraction results, stored inside the input directory
+CACHE_DIR_NAME = '.extract_cache'
 
-def get_text_with_formatting(page):
-    """Extract text from page with formatting information (bold, italic, underline)."""
-    blocks = page.get_text("dict")["blocks"]
+# Part of every cache key, so results cached by an older version of the
+# extraction code are never reused
+EXTRACTOR_VERSION = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=8).hexdigest()
+
+
+def get_text_with_formatting(page, format_html=True):
+    """Extract text from page with formatting information (bold, italic, underline).
+
+    With format_html=False the span flags are ignored and plain text is returned.
+    """
+    # Build the text page once; image blocks are never used, so don't capture them
+    textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+
+    # Without tags there is no need for the expensive span dictionary
+    if not format_html:
+        return page.get_text("text", textpage=textpage)
+
+    blocks = page.get_text("dict", textpage=textpage)["blocks"]
     formatted_text = []
 
     for block in blocks:
@@ -55,23 +111,12 @@ def clean_text(text):
     """Remove headers, page numbers, and other metadata."""
     lines = text.split('\n')
     cleaned_lines = []
-
-    skip_patterns = [
-        r'^\d{4}-\d{2}.*History Bee',  # Headers like "2021-22 A-Set History Bee"
-        r'^Bee Round \d+\s*$',  # "Bee Round 1"
-        r'^Bee Finals\s*$',  # "Bee Finals"
-        r'^Page \d+',  # Page numbers
-        r'^Regulation Tossups\s*$',  # Section headers
-        r'^Extra Questions\s*$',  # Section headers
-        r'^\s*$',  # Empty lines
-    ]
+    skip_line = SKIP_LINE_RE.match
 
     for line in lines:
         line_stripped = line.strip()
-        # Skip if line matches any skip pattern
-        if any(re.match(pattern, line_stripped) for pattern in skip_patterns):
-            continue
-        if line_stripped:  # Only add non-empty lines
+        # Only keep non-empty lines that aren't headers or page numbers
+        if line_stripped and not skip_line(line_stripped):
             cleaned_lines.append(line)
 
     return '\n'.join(cleaned_lines)
@@ -80,35 +125,24 @@ def extract_questions_from_text(text):
     """Extract individual questions and answers from cleaned text."""
     questions = []
 
-    # Pattern to match question numbers: (1), (2), etc.
-    # More flexible pattern to handle formatting tags
-    question_pattern = r'\((\d+)\)'
-
-    # Split text by question numbers
-    parts = re.split(question_pattern, text)
-
-    # Process pairs of (number, content)
-    for i in range(1, len(parts), 2):
-        if i + 1 >= len(parts):
-            break
+    # Each question runs from the end of its number to the start of the next
+    matches = list(QUESTION_NUMBER_RE.finditer(text))
 
-        q_num = parts[i]
-        content = parts[i + 1].strip()
+    for i, match in enumerate(matches):
+        q_num = match.group(1)
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        content = text[match.end():end].strip()
 
         # Split into question and answer
         # Look for ANSWER: (which might be wrapped in formatting tags)
-        answer_match = re.search(r'<strong>ANSWER:</strong>\s*(.+?)(?=\(\d+\)|$)', content, re.DOTALL)
-        if not answer_match:
-            answer_match = re.search(r'ANSWER:\s*(.+?)(?=\(\d+\)|$)', content, re.DOTALL)
+        answer_match = FORMATTED_ANSWER_RE.search(content) or PLAIN_ANSWER_RE.search(content)
 
         if answer_match:
             answer_start = answer_match.start()
-            question_text = content[:answer_start].strip()
-            answer_text = answer_match.group(1).strip()
 
-            # Clean up extra whitespace
-            question_text = re.sub(r'\s+', ' ', question_text)
-            answer_text = re.sub(r'\s+', ' ', answer_text)
+            # Trim and collapse whitespace (split/join is cheaper than a regex)
+            question_text = ' '.join(content[:answer_start].split())
+            answer_text = ' '.join(answer_match.group(1).split())
 
             questions.append({
                 'number': int(q_num),
@@ -118,23 +152,132 @@ def extract_questions_from_text(text):
 
     return questions
 
-def extract_from_pdf(pdf_path):
-    """Extract text from a PDF file with formatting."""
+def extract_questions_from_pages(pages):
+    """Extract questions from an iterable of page texts, one page at a time.
+
+    Each page is cleaned and split as it arrives instead of joining the whole
+    document into one string first. Text from the last question number on a
+    page onward is carried into the next page, since questions can span a
+    page break.
+    """
+    questions = []
+    carry = ''
+
+    for page_text in pages:
+        cleaned_text = clean_text(page_text)
+        if not cleaned_text:
+            continue
+        text = f"{carry}\n{cleaned_text}" if carry else cleaned_text
+
+        # Everything before the last question number is complete
+        last_match = None
+        for last_match in QUESTION_NUMBER_RE.finditer(text):
+            pass
+        if last_match is None:
+            # No question started yet (title page) or one long question
+            carry = text if carry else ''
+            continue
+
+        questions.extend(extract_questions_from_text(text[:last_match.start()]))
+        carry = text[last_match.start():]
+
+    questions.extend(extract_questions_from_text(carry))
+    return questions
+
+def iter_pdf_pages(pdf_path, format_html=True):
+    """Yield the formatted text of each page of a PDF file."""
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            yield get_text_with_formatting(page, format_html)
+
+def get_cache_path(cache_dir, pdf_file, format_html):
+    """Build the cache file path for a PDF; it changes whenever the PDF or this script does."""
+    stat = pdf_file.stat()
+    suffix = '' if format_html else '-plain'
+    return cache_dir / f"{pdf_file.name}-{stat.st_mtime_ns}-{stat.st_size}{suffix}-{EXTRACTOR_VERSION}.json"
+
+def remove_stale_cache_entries(cache_path, pdf_file, format_html):
+    """Delete older cache entries for the same PDF and output mode.
+
+    Best-effort, like the rest of the cache: entries that cannot be removed
+    are left behind.
+    """
+    suffix = '' if format_html else '-plain'
+    entry_re = re.compile(rf'{re.escape(pdf_file.name)}-\d+-\d+{suffix}(?:-[0-9a-f]+)?\.json')
+    try:
+        for entry in cache_path.parent.glob(f'{glob.escape(pdf_file.name)}-*.json'):
+            if entry != cache_path and entry_re.fullmatch(entry.name):
+                entry.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+def load_cached_questions(cache_path):
+    """Load cached questions for a PDF, or None if there is no usable cache entry."""
     try:
-        doc = fitz.open(pdf_path)
-        all_text = []
+        data = cache_path.read_bytes()
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    except (OSError, ValueError):
+        return None
 
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            page_text = get_text_with_formatting(page)
-            all_text.append(page_text)
+def save_cached_questions(cache_path, questions):
+    """Cache the questions extracted from a PDF.
 
-        doc.close()
-        return '\n'.join(all_text)
+    Returns False if the cache could not be written (e.g. a read-only input
+    directory); the questions are still used, only not cached.
+    """
+    if orjson is not None:
+        data = orjson.dumps(questions)
+    else:
+        data = json.dumps(questions, ensure_ascii=False).encode('utf-8')
+    try:
+        cache_path.parent.mkdir(exist_ok=True)
+        cache_path.write_bytes(data)
+    except OSError:
+        return False
+    return True
+
+def process_pdf(pdf_file, format_html=True, cache_dir=None):
+    """Extract, clean, and split one PDF into questions.
+
+    Runs in a worker process, so it only touches its own file. Returns None
+    if the PDF could not be read. If cache_dir is given, unchanged PDFs are
+    loaded from the cache instead of being parsed again.
+    """
+    cache_path = get_cache_path(cache_dir, pdf_file, format_html) if cache_dir else None
+    if cache_path:
+        questions = load_cached_questions(cache_path)
+        if questions is not None:
+            return questions
+
+    try:
+        questions = extract_questions_from_pages(iter_pdf_pages(pdf_file, format_html))
     except Exception as e:
-        print(f"Error reading {pdf_path}: {e}")
+        print(f"Error reading {pdf_file}: {e}")
         return None
 
+    # Add source filename to each question
+    for q in questions:
+        q['source_file'] = pdf_file.name
+
+    if cache_path:
+        if save_cached_questions(cache_path, questions):
+            remove_stale_cache_entries(cache_path, pdf_file, format_html)
+
+    return questions
+
+def is_answer_key(filename):
+    """Check whether a PDF filename looks like an answer key rather than a question set."""
+    name_lower = filename.lower()
+    return 'answer' in name_lower or 'key' in name_lower
+
+def dump_question(question):
+    """Serialize one question to UTF-8 exactly as json.dump(indent=2) nests it in the output list."""
+    if orjson is not None:
+        data = orjson.dumps(question, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(question, indent=2, ensure_ascii=False).encode('utf-8')
+    return b'    ' + data.replace(b'\n', b'\n    ')
+
 def parse_args():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(
@@ -150,6 +293,12 @@ Examples:
                         help='Directory containing PDF files')
     parser.add_argument('--output', '-o', required=True,
                         help='Output JSON file')
+    parser.add_argument('--jobs', '-j', type=int, default=DEFAULT_JOBS,
+                        help=f'Number of PDFs to process in parallel (default: {DEFAULT_JOBS})')
+    parser.add_argument('--plain', action='store_true',
+                        help='Emit plain text without <strong>/<em> formatting tags')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-parse every PDF instead of reusing cached results')
     return parser.parse_args()
 
 
@@ -163,7 +312,7 @@ def main():
     all_pdf_files = sorted(pdf_dir.glob('*.pdf'))
 
     # Filter out answer key files
-    pdf_files = [f for f in all_pdf_files if 'answer' not in f.name.lower() and 'key' not in f.name.lower()]
+    pdf_files = [f for f in all_pdf_files if not is_answer_key(f.name)]
     skipped = len(all_pdf_files) - len(pdf_files)
 
     print("=" * 50)
@@ -172,46 +321,44 @@ def main():
     print(f"\nInput directory: {pdf_dir}")
     print(f"Output file: {output_file}")
 
-    # All questions in a flat list
-    all_questions = []
-
     print(f"Found {len(all_pdf_files)} PDF files ({skipped} answer keys skipped)\n")
 
-    for pdf_file in pdf_files:
-        print(f"Processing {pdf_file.name}...")
-
-        # Extract text from PDF
-        text = extract_from_pdf(pdf_file)
-        if not text:
-            continue
-
-        # Clean text
-        cleaned_text = clean_text(text)
-
-        # Extract questions
-        questions = extract_questions_from_text(cleaned_text)
-
-        # Add source filename to each question
-        for q in questions:
-            q['source_file'] = pdf_file.name
-
-        all_questions.extend(questions)
-
-        print(f"  Extracted {len(questions)} questions")
-
-    # Save to JSON (flat list)
-    output = {
-        'questions': all_questions,
-        'metadata': {
-            'total': len(all_questions)
-        }
-    }
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    # Questions are written to the flat list as each PDF finishes rather than
+    # collected and dumped at the end, so they are never all held in memory.
+    # They go to a temporary file that replaces the output only once complete,
+    # so an interrupted run leaves the previous output intact.
+    total = 0
+    tmp_file = output_file.with_name(output_file.name + '.tmp')
+    try:
+        with open(tmp_file, 'wb') as f, Pool(max(args.jobs, 1)) as pool:
+            f.write(b'{\n  "questions": [')
+
+            # imap keeps results in filename order so the output is deterministic
+            cache_dir = None if args.no_cache else pdf_dir / CACHE_DIR_NAME
+            worker = partial(process_pdf, format_html=not args.plain, cache_dir=cache_dir)
+            for pdf_file, questions in zip(pdf_files, pool.imap(worker, pdf_files)):
+                print(f"Processing {pdf_file.name}...")
+                if questions is None:
+                    continue
+
+                for q in questions:
+                    f.write(b',\n' if total else b'\n')
+                    f.write(dump_question(q))
+                    total += 1
+
+                print(f"  Extracted {len(questions)} questions")
+
+            f.write(b'\n  ]' if total else b']')
+            f.write(f',\n  "metadata": {{\n    "total": {total}\n  }}\n}}'.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, output_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
 
     print(f"\n{'='*50}")
-    print(f"Total questions extracted: {len(all_questions):,}")
+    print(f"Total questions extracted: {total:,}")
     print(f"{'='*50}")
     print(f"\nSaved to {output_file}")
 